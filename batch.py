@@ -0,0 +1,140 @@
+import sys
+import time
+import numpy as np
+from game import Field, Game
+
+
+class BatchGame:
+    def __init__(self, boards):
+        self.boards = boards
+        self.batch, self.size = boards.shape[0], boards.shape[1]
+        self.scores = np.zeros(self.batch, dtype=np.int64)
+        self.points = np.array(self.get_points_table(self.size ** 2),
+                               dtype=np.int64)
+        self._rows = np.arange(self.batch)
+
+    @classmethod
+    def random(cls, batch, size, colors_count=5, seed=None):
+        boards = np.empty((batch, size, size), dtype=np.int8)
+        cls.fill_random(boards, colors_count, np.random.default_rng(seed))
+        return cls(boards)
+
+    @classmethod
+    def from_games(cls, games):
+        size = games[0].size
+        boards = np.zeros((len(games), size, size), dtype=np.int8)
+        for index, game in enumerate(games):
+            for x_coord in range(size):
+                for y_coord in range(size):
+                    cube = game.get(x_coord, y_coord)
+                    if not cube:
+                        continue
+                    if len(cube.colors) > 1:
+                        raise ValueError('Multicolor cubes are not supported')
+                    boards[index, x_coord, y_coord] = \
+                        Field.colors.index(cube.colors[0]) + 1
+        return cls(boards)
+
+    @staticmethod
+    def get_points_table(max_count):
+        table = []
+        for count in range(max_count + 1):
+            points = Game.get_points(count)
+            if points > np.iinfo(np.int64).max // 2:
+                break
+            table.append(points)
+        return table
+
+    @staticmethod
+    def fill_random(boards, colors_count, rng):
+        boards[...] = rng.integers(1, colors_count + 1, size=boards.shape,
+                                   dtype=np.int8)
+
+    def get_the_same(self, xs, ys):
+        colors = self.boards[self._rows, xs, ys]
+        same = (self.boards == colors[:, None, None]) & \
+            (colors != 0)[:, None, None]
+        block = np.zeros_like(same)
+        block[self._rows, xs, ys] = colors != 0
+
+        active = np.flatnonzero(colors != 0)
+        current, same = block[active], same[active]
+        while active.size:
+            grown = current.copy()
+            grown[:, 1:] |= current[:, :-1]
+            grown[:, :-1] |= current[:, 1:]
+            grown[:, :, 1:] |= current[:, :, :-1]
+            grown[:, :, :-1] |= current[:, :, 1:]
+            grown &= same
+            changed = (grown != current).any(axis=(1, 2))
+            current = grown
+            if not changed.all():
+                block[active] = current
+                active = active[changed]
+                current, same = current[changed], same[changed]
+        return block
+
+    def step(self, xs, ys):
+        block = self.get_the_same(xs, ys)
+        counts = block.sum(axis=(1, 2))
+        moved = counts > 1
+        block &= moved[:, None, None]
+        self.boards[block] = 0
+
+        if counts.max() < len(self.points):
+            deltas = self.points[counts]
+        else:
+            deltas = np.array([Game.get_points(count) for count in counts],
+                              dtype=object)
+        if self.scores.dtype != object and (
+                deltas.dtype == object or
+                int(self.scores.max()) + int(deltas.max()) >
+                np.iinfo(np.int64).max):
+            # Scores outgrow int64, fall back to Python ints
+            self.scores = self.scores.astype(object)
+        self.scores += deltas
+        if moved.any():
+            self.tick(np.flatnonzero(moved))
+        return deltas
+
+    def tick(self, indices):
+        boards = self.boards[indices]
+        order = np.argsort(boards != 0, axis=2, kind='stable')
+        boards = np.take_along_axis(boards, order, axis=2)
+        order = np.argsort(~boards.any(axis=2), axis=1, kind='stable')
+        self.boards[indices] = np.take_along_axis(boards, order[:, :, None],
+                                                  axis=1)
+
+    def removable(self):
+        return get_removable(self.boards)
+
+    @property
+    def is_finished(self):
+        return ~self.removable().any(axis=(1, 2))
+
+
+def get_removable(boards):
+    filled = boards != 0
+    same_x = (boards[:, 1:] == boards[:, :-1]) & filled[:, 1:]
+    same_y = (boards[:, :, 1:] == boards[:, :, :-1]) & filled[:, :, 1:]
+    result = np.zeros_like(filled)
+    result[:, 1:] |= same_x
+    result[:, :-1] |= same_x
+    result[:, :, 1:] |= same_y
+    result[:, :, :-1] |= same_y
+    return result
+
+
+def benchmark(batch=4096, size=15, steps=50):
+    game = BatchGame.random(batch, size, seed=0)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for _ in range(steps):
+        game.step(rng.integers(0, size, batch), rng.integers(0, size, batch))
+    elapsed = time.perf_counter() - start
+    print('%d moves in %.3fs: %d moves/sec'
+          % (batch * steps, elapsed, batch * steps / elapsed))
+
+
+if __name__ == '__main__':
+    benchmark(*[int(arg) for arg in sys.argv[1:]])
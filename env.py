@@ -0,0 +1,164 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from batch import BatchGame, get_removable
+
+
+class CubesEnv:
+    def __init__(self, size=15, colors_count=5):
+        self.size = size
+        self.colors_count = colors_count
+        self.game = BatchGame(np.zeros((1, size, size), dtype=np.int8))
+        self.observation = self.game.boards[0].view()
+        self.observation.flags.writeable = False
+        self.rng = np.random.default_rng()
+        self._xs = np.zeros(1, dtype=np.intp)
+        self._ys = np.zeros(1, dtype=np.intp)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        BatchGame.fill_random(self.game.boards, self.colors_count, self.rng)
+        self.game.scores[:] = 0
+        return self.observation
+
+    def step(self, x_coord, y_coord):
+        self._xs[0] = x_coord
+        self._ys[0] = y_coord
+        reward = self.game.step(self._xs, self._ys)[0]
+        done = bool(self.game.is_finished[0])
+        return self.observation, int(reward), done, \
+            {'score': int(self.game.scores[0])}
+
+    def legal_moves(self):
+        return self.game.removable()[0]
+
+
+def _run_worker(connection, names, num_envs, size, colors_count, start, stop):
+    memory = [SharedMemory(name=name) for name in names]
+    boards, actions, rewards, dones, finals = \
+        _attach(memory, num_envs, size)
+    game = BatchGame(boards[start:stop])
+    rngs = _spawn_rngs(None, num_envs)[start:stop]
+    try:
+        while True:
+            command, seed = connection.recv()
+            if command == 'close':
+                break
+            if command == 'reset':
+                rngs = _spawn_rngs(seed, num_envs)[start:stop]
+                for board, rng in zip(game.boards, rngs):
+                    BatchGame.fill_random(board, colors_count, rng)
+                game.scores[:] = 0
+            elif command == 'step':
+                rewards[start:stop] = game.step(actions[start:stop, 0],
+                                                actions[start:stop, 1])
+                finished = game.is_finished
+                dones[start:stop] = finished
+                for index in np.flatnonzero(finished):
+                    finals[start + index] = game.boards[index]
+                    BatchGame.fill_random(game.boards[index], colors_count,
+                                          rngs[index])
+                    game.scores[index] = 0
+            connection.send(command)
+    finally:
+        del boards, actions, rewards, dones, finals, game
+        for block in memory:
+            block.close()
+        connection.close()
+
+
+def _spawn_rngs(seed, num_envs):
+    return [np.random.default_rng(sequence) for sequence
+            in np.random.SeedSequence(seed).spawn(num_envs)]
+
+
+def _attach(memory, num_envs, size):
+    shapes = [((num_envs, size, size), np.int8),
+              ((num_envs, 2), np.intp),
+              ((num_envs,), np.float64),
+              ((num_envs,), np.bool_),
+              ((num_envs, size, size), np.int8)]
+    return [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            for block, (shape, dtype) in zip(memory, shapes)]
+
+
+class SubprocVectorEnv:
+    def __init__(self, num_envs, size=15, colors_count=5, workers=None):
+        self.num_envs = num_envs
+        self.size = size
+        self.colors_count = colors_count
+        workers = min(workers or multiprocessing.cpu_count(), num_envs)
+
+        nbytes = [num_envs * size * size,
+                  num_envs * 2 * np.dtype(np.intp).itemsize,
+                  num_envs * np.dtype(np.float64).itemsize,
+                  num_envs,
+                  num_envs * size * size]
+        self.memory = [SharedMemory(create=True, size=max(count, 1))
+                       for count in nbytes]
+        self.boards, self.actions, self.rewards, self.dones, self.finals = \
+            _attach(self.memory, num_envs, size)
+        self.observations = self.boards.view()
+        self.observations.flags.writeable = False
+        # Finished envs are reset within step, their last boards are kept
+        # here and are valid where dones is set
+        final_observations = self.finals.view()
+        final_observations.flags.writeable = False
+        self.infos = {'final_observation': final_observations}
+
+        self.connections = []
+        self.processes = []
+        bounds = np.linspace(0, num_envs, workers + 1).astype(int)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_run_worker,
+                args=(worker_connection,
+                      [block.name for block in self.memory],
+                      num_envs, size, colors_count, start, stop),
+                daemon=True)
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _call(self, command, argument=None):
+        for connection in self.connections:
+            connection.send((command, argument))
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self, seed=None):
+        self._call('reset', seed)
+        return self.observations
+
+    def step(self, xs, ys):
+        self.actions[:, 0] = xs
+        self.actions[:, 1] = ys
+        self._call('step')
+        return self.observations, self.rewards, self.dones, self.infos
+
+    def legal_moves(self):
+        return get_removable(self.boards)
+
+    def close(self):
+        if not self.connections:
+            return
+        for connection in self.connections:
+            connection.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+        del self.boards, self.actions, self.rewards, self.dones, self.finals
+        del self.observations, self.infos
+        for block in self.memory:
+            block.close()
+            block.unlink()
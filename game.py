@@ -1,6 +1,6 @@
 import logging
+import random
 from queue import Queue
-from random import randint, random
 from collections import defaultdict
 
 
@@ -16,17 +16,31 @@ class Cube:
         self.location = location
 
 
+class ChangeSet:
+    def __init__(self):
+        self.removed = []
+        # column -> {row before falling: stages down}
+        self.falls = {}
+        # indices in removal order, each relative to the already joined field
+        self.removed_columns = []
+        self.score_delta = 0
+
+    def __bool__(self):
+        return bool(self.removed)
+
+
 class Field:
     colors = ['red', 'green', 'yellow', 'blue', 'purple', 'aqua', 'orange']
 
-    def __init__(self, size, settings):
+    def __init__(self, size, settings, rng=None):
         self.size = size
         self.cubes = defaultdict(int)
-        self._field = self.create_random_field(settings)
+        self._field = self.create_random_field(settings, rng)
         self.empty = None
         self.right_border = self.size
 
-    def create_random_field(self, settings=None):
+    def create_random_field(self, settings=None, rng=None):
+        rng = rng or random
         field = []
         colors_count = settings['colors_count']
         multiple_colors = settings['multiple_colors']
@@ -37,7 +51,7 @@ class Field:
             field.append([])
             for y_coord in range(self.size):
                 multiplier = multiple_colors \
-                    if (random() > 0.8 and multicube_count > 0) else 1
+                    if (rng.random() > 0.8 and multicube_count > 0) else 1
                 cube_colors = tuple()
 
                 if multiplier > 1:
@@ -48,7 +62,7 @@ class Field:
                     unused_colors = [color for color in unused_colors
                                      if color not in cube_colors]
                     cube_colors += \
-                        unused_colors[randint(0, len(unused_colors) - 1)],
+                        unused_colors[rng.randint(0, len(unused_colors) - 1)],
                 for color in cube_colors:
                     self.cubes[color] += 1
                 field[x_coord].append(Cube(cube_colors, (x_coord, y_coord)))
@@ -154,10 +168,10 @@ class Game:
 
     record_table = []
 
-    def __init__(self, size, player, settings=None):
+    def __init__(self, size, player, settings=None, rng=None):
         self.size = size
         self.settings = settings or Game._default_settings
-        self.field = Field(size, self.settings)
+        self.field = Field(size, self.settings, rng)
         self.player = player
         # self.logger = logging
         # self.logger.basicConfig(
@@ -167,6 +181,8 @@ class Game:
         if not self.record_table:
             Game.record_table = self.load_record_table()
         self.score = 0
+        self.observers = []
+        self.last_changes = ChangeSet()
 
     def replicate(self):
         return Game(self.size, self.player, self.settings)
@@ -179,17 +195,33 @@ class Game:
                     if self.try_delete_block(cube):
                         break
 
+    def subscribe(self, observer):
+        self.observers.append(observer)
+
+    def unsubscribe(self, observer):
+        self.observers.remove(observer)
+
+    def notify(self, changes):
+        for observer in self.observers:
+            observer(changes)
+
     def try_delete_block(self, cube):
         result = self.field.get_the_same(cube)
         count = len(result)
+        changes = ChangeSet()
         if count > 1:
             for item in result:
+                changes.removed.append(item.location)
                 self.delete(item)
                 for color in item.colors:
                     self.field.cubes[color] -= 1
-            self.score += self.get_points(count)
+            changes.score_delta = self.get_points(count)
+            self.score += changes.score_delta
 
-        self.tick()
+        changes.falls, changes.removed_columns = self.tick()
+        self.last_changes = changes
+        if changes:
+            self.notify(changes)
         return count > 1
 
     def load_record_table(self):
@@ -226,10 +258,10 @@ class Game:
         return points
 
     def tick(self):
-        self.fall_down()
-        self.join()
+        return self.fall_down(), self.join()
 
     def fall_down(self):
+        falls = {}
         for x_coord in range(self.size):
             for y_coord in range(self.size - 2, -1, -1):
                 cube = self.get(x_coord, y_coord)
@@ -244,10 +276,15 @@ class Game:
                             x_coord, y_coord + stages_down + 1)
                     if stages_down > 0:
                         self.move_to(x_coord, y_coord + stages_down, cube)
+                        falls.setdefault(x_coord, {})[y_coord] = stages_down
+        return falls
 
     def join(self):
+        removed_columns = []
         while self.field.has_empty_columns():
+            removed_columns.append(self.field.empty)
             self.field.make_shift()
+        return removed_columns
 
     def move_to(self, x_coord, y_coord, cube):
         self.set(cube.location[0], cube.location[1], None)
@@ -1,24 +1,36 @@
+import argparse
+import os
 import sys
+from array import array
 from PyQt5.QtWidgets import QApplication, QFrame, QPushButton, QLabel,\
     QLineEdit, QVBoxLayout, QStackedLayout, QWidget, QTableWidget
-from PyQt5.QtGui import QPainter, QColor, QFont, QIntValidator
-from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPainter, QColor, QFont, QIntValidator, QImage, \
+    QMouseEvent, QWheelEvent
+from PyQt5.QtCore import Qt, QRectF, QEvent, QPoint, QPointF
 from game import Game
+from perf import FrameProfiler, load_script
+from pool import GamePool, has_moves
+from viewport import Viewport
 
 
 class Window(QFrame):
-    def __init__(self):
+    def __init__(self, profiler=None, overlay=False, pool=None):
         super().__init__()
 
         self.move(350, 100)
         self.setFixedSize(500, 380)
 
         self.game = Game(15, '')
+        self.pool = pool or GamePool(accept=has_moves)
         self.in_game = False
         self.is_game_finished = False
         self.is_result_saved = False
         self.player = ''
         self.chosen_cubes = set()
+        self.viewport = None
+        self.board_image = None
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self.overlay = overlay
         self.setWindowTitle('Cubes')
 
         self.main_menu = QWidget(self)
@@ -36,6 +48,7 @@ class Window(QFrame):
         self.set_customization_layout()
         self.set_main_menu_layout()
         self.stacked.setCurrentWidget(self.main_menu)
+        self.prepare_game()
 
         self.show()
 
@@ -43,46 +56,60 @@ class Window(QFrame):
         if self.is_game_finished:
             return
 
-        x_coord, y_coord = self.get_cell_from_event(event)
-        self.chosen_cubes = set()
-
-        if not self.is_in_cubes_field(x_coord, y_coord):
-            self.repaint()
-            return
+        with self.profiler.event('move'):
+            cell = self.get_cell_from_event(event)
+            self.chosen_cubes = set()
 
-        cube = self.game.get(x_coord, y_coord)
-        if cube:
-            the_same = self.game.field.get_the_same(cube)
-            if len(the_same) > 1:
-                self.chosen_cubes = the_same
-        self.repaint()
+            if not cell:
+                self.repaint()
+                return
 
-    def is_in_cubes_field(self, x_coord, y_coord):
-        return x_coord < self.game.size and \
-               y_coord < self.game.size
+            cube = self.game.get(*cell)
+            if cube:
+                with self.profiler.measure('game'):
+                    the_same = self.game.field.get_the_same(cube)
+                if len(the_same) > 1:
+                    self.chosen_cubes = the_same
+            self.repaint()
 
     def get_cell_from_event(self, event):
-        x_coord = event.x() // self.cube_size
-        y_coord = event.y() // self.cube_size
-        return x_coord, y_coord
+        return self.viewport.to_cell(event.x(), event.y())
 
     def mousePressEvent(self, event):
         if self.is_game_finished or not self.in_game:
             return
 
-        x_coord, y_coord = self.get_cell_from_event(event)
-        self.chosen_cubes = set()
+        with self.profiler.event('click'):
+            cell = self.get_cell_from_event(event)
+            self.chosen_cubes = set()
+
+            if not cell:
+                return
 
-        if not self.is_in_cubes_field(x_coord, y_coord):
+            self.profiler.input()
+            cube = self.game.get(*cell)
+            if cube:
+                with self.profiler.measure('game'):
+                    self.game.try_delete_block(cube)
+            self.repaint()
+
+    def wheelEvent(self, event):
+        if self.is_game_finished or not self.in_game:
             return
 
-        cube = self.game.get(x_coord, y_coord)
-        if cube:
-            self.game.try_delete_block(cube)
+        steps = event.angleDelta().y() / 120
+        if event.modifiers() & Qt.ControlModifier:
+            self.viewport.zoom(1.25 ** steps, event.x(), event.y())
+        elif event.modifiers() & Qt.ShiftModifier:
+            self.viewport.scroll(-steps * 40, 0)
+        else:
+            self.viewport.scroll(0, -steps * 40)
+        self.chosen_cubes = set()
         self.repaint()
 
     def closeEvent(self, event):
         self.game.save_record_table()
+        self.pool.close(wait=False)
         event.accept()
 
     def customize_game(self):
@@ -90,14 +117,11 @@ class Window(QFrame):
         if not self.player:
             return
 
+        self.prepare_game()
         self.change_current_widget(self.settings)
 
-    def start(self):
+    def get_game_settings(self):
         game_size = int(self.game_size_edit.text())
-
-        if not self.has_acceptable_inputs():
-            return
-
         colors_count = int(self.count_edit.text())
         multiple_colors = int(self.multiple_edit.text())
         multicube_count = int(self.multicube_edit.text())
@@ -107,21 +131,46 @@ class Window(QFrame):
             'multiple_colors': multiple_colors,
             'multicube_count': multicube_count
         }
+        return game_size, settings
+
+    def prepare_game(self):
+        if self.has_acceptable_inputs():
+            self.pool.prepare(*self.get_game_settings())
+
+    def start(self):
+        if not self.has_acceptable_inputs():
+            return
 
-        self.game = Game(game_size, self.player, settings)
-        self.game.player = self.player
-        self.cube_size = int(self.height() / self.game.size)
+        game_size, settings = self.get_game_settings()
+        self.game = self.pool.get(game_size, self.player, settings)
+        self.viewport = Viewport(self.height(), self.height(), game_size)
         self.reset()
         self.change_current_widget(self.game_widget)
 
     def restart(self):
-        self.game = self.game.replicate()
+        self.game = self.pool.get(self.game.size, self.game.player,
+                                  self.game.settings)
         self.reset()
         self.repaint()
 
     def reset(self):
         self.is_result_saved = False
         self.is_game_finished = False
+        self.chosen_cubes = set()
+        self.board_image = None
+        self.game.subscribe(self.on_game_changed)
+
+    def on_game_changed(self, changes):
+        if not self.board_image:
+            return
+
+        with self.profiler.measure('paint'):
+            columns = set(changes.falls)
+            columns.update(x_coord for x_coord, _ in changes.removed)
+            if changes.removed_columns:
+                columns.update(range(min(changes.removed_columns),
+                                     self.game.size))
+            self.paint_board_columns(self.board_image, columns)
 
     def has_acceptable_inputs(self):
         return (self.game_size_edit.hasAcceptableInput() and
@@ -224,9 +273,9 @@ class Window(QFrame):
 
         size_label = QLabel('Game size')
         vbox.addWidget(size_label, alignment=Qt.AlignCenter)
-        self.game_size_edit = self.add_line_edit('Should be from 3 to 30',
+        self.game_size_edit = self.add_line_edit('Should be from 3 to 500',
                                                  vbox, 15,
-                                                 QIntValidator(3, 30))
+                                                 QIntValidator(3, 500))
 
         self.game_size_edit.textChanged.connect(self.change_validator)
 
@@ -244,6 +293,11 @@ class Window(QFrame):
         self.settings.layout().addWidget(multicube_label,
                                          alignment=Qt.AlignCenter)
         self.multicube_edit = self.add_line_edit('', self.settings.layout(), 0)
+        self.change_validator()
+
+        for edit in (self.game_size_edit, self.count_edit,
+                     self.multiple_edit, self.multicube_edit):
+            edit.textChanged.connect(self.prepare_game)
 
         self.add_button('Go', self.start, vbox)
 
@@ -251,27 +305,32 @@ class Window(QFrame):
 
     def paintEvent(self, event):
         if self.in_game:
-            self.painter.begin(self)
-            self.draw()
-            self.painter.end()
+            with self.profiler.event('paint'):
+                self.painter.begin(self)
+                with self.profiler.measure('paint'):
+                    self.draw()
+                    if self.overlay:
+                        self.draw_overlay()
+                self.painter.end()
+                self.profiler.frame()
 
     def draw(self):
         if self.is_game_finished:
             return
 
         self.painter.setRenderHint(self.painter.Antialiasing)
-        info_x = self.game.size * self.cube_size + 10
+        viewport = self.viewport
+        board_width = min(viewport.width, viewport.board_extent)
+        board_height = min(viewport.height, viewport.board_extent)
+        info_x = viewport.width + 10
         info_y = 20
-        self.painter.drawRect(0, 0, self.game.size * self.cube_size,
-                              self.game.size * self.cube_size)
-        for x_coord in range(0, self.game.size):
-            for y_coord in range(0, self.game.size):
-                cube = self.game.get(x_coord, y_coord)
-                if cube:
-                    is_enlighten = cube in self.chosen_cubes
-                    self.draw_cube(x_coord * self.cube_size,
-                                   y_coord * self.cube_size,
-                                   cube.colors, is_enlighten)
+        self.painter.drawRect(QRectF(0, 0, board_width, board_height))
+        self.painter.setClipRect(QRectF(0, 0, board_width, board_height))
+        if viewport.is_image_mode:
+            self.draw_board_image(board_width, board_height)
+        else:
+            self.draw_visible_cubes()
+        self.painter.setClipping(False)
 
         self.painter.setFont(QFont('Arial', 10))
         points = str(self.game.score)
@@ -290,27 +349,99 @@ class Window(QFrame):
                                   str(self.game.field.cubes[color]))
             info_y += 30
 
-        if self.game.is_finished:
+        with self.profiler.measure('game'):
+            is_finished = self.game.is_finished
+        if is_finished:
             self.is_game_finished = True
             self.painter.setFont(QFont('Arial', 30))
-            self.painter.drawText(self.game.size * self.cube_size / 4,
-                                  self.game.size * self.cube_size / 2,
+            self.painter.drawText(int(board_width / 4),
+                                  int(board_height / 2),
                                   'GAME OVER')
             self.save_result()
             return
 
+    def draw_overlay(self):
+        lines = self.profiler.summary()
+        self.painter.fillRect(QRectF(5, 5, 170, 15 * len(lines) + 6),
+                              QColor(255, 255, 255, 220))
+        self.painter.setFont(QFont('Arial', 8))
+        info_y = 18
+        for line in lines:
+            self.painter.drawText(10, info_y, line)
+            info_y += 15
+
+    def draw_visible_cubes(self):
+        columns, rows = self.viewport.visible_cells()
+        for x_coord in columns:
+            for y_coord in rows:
+                cube = self.game.get(x_coord, y_coord)
+                if cube:
+                    is_enlighten = cube in self.chosen_cubes
+                    screen_x, screen_y = self.viewport.to_screen(x_coord,
+                                                                 y_coord)
+                    self.draw_cube(screen_x, screen_y,
+                                   cube.colors, is_enlighten)
+
+    def draw_board_image(self, board_width, board_height):
+        if not self.board_image:
+            self.board_image = self.create_board_image()
+        cell_size = self.viewport.cell_size
+        source = QRectF(self.viewport.offset_x / cell_size,
+                        self.viewport.offset_y / cell_size,
+                        board_width / cell_size,
+                        board_height / cell_size)
+        self.painter.drawImage(QRectF(0, 0, board_width, board_height),
+                               self.board_image, source)
+
+        highlight = QColor(255, 255, 255, 160)
+        size = max(cell_size, 1)
+        for cube in self.chosen_cubes:
+            screen_x, screen_y = self.viewport.to_screen(*cube.location)
+            if -size < screen_x < board_width and \
+                    -size < screen_y < board_height:
+                self.painter.fillRect(QRectF(screen_x, screen_y, size, size),
+                                      highlight)
+
+    def create_board_image(self):
+        size = self.game.size
+        pixels = array('I', bytes(4 * size * size))
+        rgba = {}
+        for x_coord in range(size):
+            for y_coord in range(size):
+                cube = self.game.get(x_coord, y_coord)
+                if cube:
+                    color = cube.colors[0]
+                    if color not in rgba:
+                        rgba[color] = QColor(color).rgba()
+                    pixels[y_coord * size + x_coord] = rgba[color]
+        return QImage(pixels.tobytes(), size, size, 4 * size,
+                      QImage.Format_ARGB32).copy()
+
+    def paint_board_columns(self, image, columns):
+        rgba = {}
+        for x_coord in columns:
+            for y_coord in range(self.game.size):
+                cube = self.game.get(x_coord, y_coord)
+                if not cube:
+                    image.setPixel(x_coord, y_coord, 0)
+                    continue
+                color = cube.colors[0]
+                if color not in rgba:
+                    rgba[color] = QColor(color).rgba()
+                image.setPixel(x_coord, y_coord, rgba[color])
+
     def draw_cube(self, x_coord, y_coord, color, enlighten=False, size=None):
         if not size:
-            size = self.cube_size
-        rect = QRect(x_coord, y_coord, size, size)
+            size = self.viewport.cell_size
+        rect = QRectF(x_coord, y_coord, size, size)
         divisor = len(color)
         self.painter.drawRect(rect)
         for i in range(divisor):
             q_color = QColor(color[i])
             if enlighten:
                 q_color.setAlpha(160)
-            new_rect = QRect(int(x_coord + size / divisor * i), y_coord,
-                             int(size / divisor), size)
+            new_rect = QRectF(x_coord + size / divisor * i, y_coord,
+                              size / divisor, size)
             self.painter.fillRect(new_rect, q_color)
 
     @staticmethod
@@ -331,7 +462,66 @@ class Window(QFrame):
         return edit
 
 
+def replay(app, window, script, game_size):
+    window.nick_edit.setText('replay')
+    window.customize_game()
+    window.game_size_edit.setText(str(game_size))
+    window.start()
+    app.processEvents()
+
+    for command, args in script:
+        if command == 'move':
+            event = QMouseEvent(QEvent.MouseMove, QPoint(*args),
+                                Qt.NoButton, Qt.NoButton, Qt.NoModifier)
+            app.sendEvent(window.game_widget, event)
+        elif command == 'click':
+            event = QMouseEvent(QEvent.MouseButtonPress, QPoint(*args),
+                                Qt.LeftButton, Qt.LeftButton, Qt.NoModifier)
+            app.sendEvent(window, event)
+        elif command == 'wheel':
+            x_coord, y_coord, delta = args[:3]
+            modifiers = Qt.ControlModifier if args[3:] == [1] \
+                else Qt.NoModifier
+            event = QWheelEvent(QPointF(x_coord, y_coord),
+                                QPointF(x_coord, y_coord), QPoint(),
+                                QPoint(0, delta), Qt.NoButton, modifiers,
+                                Qt.NoScrollPhase, False)
+            app.sendEvent(window, event)
+        elif command == 'restart':
+            window.restart()
+        app.processEvents()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Cubes')
+    parser.add_argument('--perf', action='store_true',
+                        help='show the frame time overlay')
+    parser.add_argument('--trace', help='write a CSV trace of GUI events')
+    parser.add_argument('--replay',
+                        help='replay scripted events offscreen and exit')
+    parser.add_argument('--size', type=int, default=15,
+                        help='game size for --replay')
+    parser.add_argument('--seed', type=int,
+                        help='board seed for --replay')
+    return parser.parse_args()
+
+
 if __name__ == '__main__':
-    APP = QApplication(sys.argv)
-    WINDOW = Window()
-    APP.exec_()
+    ARGS = parse_args()
+    if ARGS.replay:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    APP = QApplication(sys.argv[:1])
+    PROFILER = FrameProfiler(enabled=bool(ARGS.perf or ARGS.trace or
+                                          ARGS.replay))
+    # Background workers race with each other, so replays generate every
+    # board synchronously from one seeded stream
+    POOL = GamePool(accept=has_moves, seed=ARGS.seed,
+                    background=not ARGS.replay)
+    WINDOW = Window(PROFILER, ARGS.perf, POOL)
+    if ARGS.replay:
+        replay(APP, WINDOW, load_script(ARGS.replay), ARGS.size)
+        print('\n'.join(PROFILER.summary()))
+    else:
+        APP.exec_()
+    if ARGS.trace:
+        PROFILER.save_csv(ARGS.trace)
@@ -0,0 +1,119 @@
+import csv
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class FrameProfiler:
+    fields = ['event', 'start_ms', 'game_ms', 'paint_ms',
+              'frame_interval_ms', 'input_latency_ms']
+
+    def __init__(self, enabled=True, clock=time.perf_counter, history=60):
+        self.enabled = enabled
+        self.clock = clock
+        self.started = clock()
+        self.records = []
+        self.recent = deque(maxlen=history)
+        self.last_frame = None
+        self.input_time = None
+        self._events = []
+        self._measures = []
+
+    @contextmanager
+    def event(self, name):
+        if not self.enabled:
+            yield None
+            return
+
+        record = {
+            'event': name,
+            'start': self.clock() - self.started,
+            'game': 0.0,
+            'paint': 0.0,
+            'frame_interval': None,
+            'input_latency': None
+        }
+        self._events.append(record)
+        self.records.append(record)
+        try:
+            yield record
+        finally:
+            self._events.pop()
+            self.recent.append(record)
+
+    @contextmanager
+    def measure(self, kind):
+        if not self.enabled:
+            yield
+            return
+
+        start = self.clock()
+        self._measures.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            nested = self._measures.pop()
+            if self._measures:
+                self._measures[-1] += elapsed
+            if self._events:
+                self._events[-1][kind] += elapsed - nested
+
+    def input(self):
+        if self.enabled and self.input_time is None:
+            self.input_time = self.clock()
+
+    def frame(self):
+        if not self.enabled:
+            return
+
+        now = self.clock()
+        record = self._events[-1] if self._events else None
+        if record is not None:
+            if self.last_frame is not None:
+                record['frame_interval'] = now - self.last_frame
+            if self.input_time is not None:
+                record['input_latency'] = now - self.input_time
+        self.last_frame = now
+        self.input_time = None
+
+    def summary(self):
+        lines = []
+        intervals = [record['frame_interval'] for record in self.recent
+                     if record['frame_interval'] is not None]
+        if intervals:
+            interval = sum(intervals) / len(intervals)
+            lines.append('Frame: %.1f ms' % (interval * 1000))
+        for kind in ('game', 'paint'):
+            times = [record[kind] for record in self.recent]
+            if times:
+                lines.append('%s: %.1f ms (max %.1f)'
+                             % (kind.capitalize(),
+                                sum(times) / len(times) * 1000,
+                                max(times) * 1000))
+        latencies = [record['input_latency'] for record in self.recent
+                     if record['input_latency'] is not None]
+        if latencies:
+            lines.append('Click to frame: %.1f ms' % (latencies[-1] * 1000))
+        return lines
+
+    def save_csv(self, path):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.fields)
+            for record in self.records:
+                writer.writerow([record['event']] + [
+                    '' if record[key] is None else
+                    '%.3f' % (record[key] * 1000)
+                    for key in ('start', 'game', 'paint',
+                                'frame_interval', 'input_latency')])
+
+
+def load_script(path):
+    script = []
+    with open(path) as file:
+        for line in file:
+            line = line.split('#')[0].split()
+            if line:
+                script.append((line[0], [int(arg) for arg in line[1:]]))
+    return script
@@ -0,0 +1,129 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from queue import Queue, Empty, Full
+from game import Game
+
+
+def has_moves(game):
+    return not game.is_finished
+
+
+def is_balanced(game, tolerance=0.5):
+    counts = list(game.field.cubes.values())
+    if len(counts) < game.settings['colors_count']:
+        return False
+    return min(counts) >= sum(counts) / len(counts) * (1 - tolerance)
+
+
+def is_playable(game):
+    return is_balanced(game) and has_moves(game)
+
+
+class YieldingRandom(random.Random):
+    # Generating a big board holds the GIL for about a second; sleeping
+    # every few draws lets the UI thread run in between
+    yield_every = 100
+
+    def __init__(self, seed=None):
+        self.draws = 0
+        super().__init__(seed)
+
+    def random(self):
+        self.draws += 1
+        if self.draws % self.yield_every == 0:
+            time.sleep(0)
+        return super().random()
+
+
+class GamePool:
+    def __init__(self, capacity=3, max_profiles=4, max_cubes=100000,
+                 accept=None, max_attempts=100, seed=None, background=True):
+        self.capacity = capacity
+        self.max_profiles = max_profiles
+        self.max_cubes = max_cubes
+        self.accept = accept
+        self.max_attempts = max_attempts
+        self.seed = seed
+        self.background = background
+        self.rng = random.Random(seed)
+        self._profiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_profile(size, settings):
+        return size, tuple(sorted(settings.items()))
+
+    def generate(self, size, settings, rng, stop=None):
+        for _ in range(self.max_attempts):
+            if stop and stop.is_set():
+                return None
+            game = Game(size, '', settings, rng)
+            if not self.accept or self.accept(game):
+                return game
+        logging.warning('No acceptable board of size %s in %s attempts'
+                        % (size, self.max_attempts))
+        return None
+
+    def prepare(self, size, settings):
+        if not self.background:
+            return None
+
+        profile = self.get_profile(size, settings)
+        with self._lock:
+            if profile in self._profiles:
+                self._profiles.move_to_end(profile)
+                return self._profiles[profile][0]
+
+            capacity = max(1, min(self.capacity, self.max_cubes // size ** 2))
+            queue = Queue(capacity)
+            stop = threading.Event()
+            rng = YieldingRandom(None if self.seed is None
+                                 else '%s:%s' % (self.seed, profile))
+            worker = threading.Thread(target=self._fill,
+                                      args=(size, dict(settings),
+                                            queue, stop, rng),
+                                      daemon=True)
+            self._profiles[profile] = queue, stop, worker
+            worker.start()
+
+            if len(self._profiles) > self.max_profiles:
+                _, (_, old_stop, _) = self._profiles.popitem(last=False)
+                old_stop.set()
+            return queue
+
+    def get(self, size, player, settings):
+        queue = self.prepare(size, settings)
+        try:
+            game = queue.get_nowait() if queue else None
+        except Empty:
+            game = None
+        if game is None:
+            game = self.generate(size, settings, self.rng)
+        if game is None:
+            logging.warning('Falling back to an unfiltered board')
+            game = Game(size, '', settings, self.rng)
+        game.player = player
+        return game
+
+    def close(self, wait=True):
+        with self._lock:
+            profiles = list(self._profiles.values())
+            self._profiles.clear()
+        for _, stop, _ in profiles:
+            stop.set()
+        if wait:
+            for _, _, worker in profiles:
+                worker.join()
+
+    def _fill(self, size, settings, queue, stop, rng):
+        while not stop.is_set():
+            game = self.generate(size, settings, rng, stop)
+            while game is not None and not stop.is_set():
+                try:
+                    queue.put(game, timeout=0.1)
+                    break
+                except Full:
+                    continue
@@ -0,0 +1,97 @@
+import random
+import unittest
+import numpy as np
+from batch import BatchGame
+from game import Field, Game
+
+
+SETTINGS = {
+    'colors_count': 4,
+    'multiple_colors': 2,
+    'multicube_count': 0
+}
+
+
+def to_board(game):
+    board = np.zeros((game.size, game.size), dtype=np.int8)
+    for x_coord in range(game.size):
+        for y_coord in range(game.size):
+            cube = game.get(x_coord, y_coord)
+            if cube:
+                board[x_coord, y_coord] = \
+                    Field.colors.index(cube.colors[0]) + 1
+    return board
+
+
+class BatchGameTest(unittest.TestCase):
+
+    def test_same_as_game(self):
+        random.seed(0)
+        rng = random.Random(0)
+        games = [Game(8, '', SETTINGS) for _ in range(32)]
+        batch = BatchGame.from_games(games)
+
+        for _ in range(40):
+            xs = [rng.randrange(8) for _ in games]
+            ys = [rng.randrange(8) for _ in games]
+            expected = []
+            for game, x_coord, y_coord in zip(games, xs, ys):
+                cube = game.get(x_coord, y_coord)
+                score = game.score
+                if cube:
+                    game.try_delete_block(cube)
+                expected.append(game.score - score)
+
+            deltas = batch.step(np.array(xs), np.array(ys))
+            self.assertEqual(deltas.tolist(), expected)
+            for index, game in enumerate(games):
+                np.testing.assert_array_equal(batch.boards[index],
+                                              to_board(game))
+                self.assertEqual(batch.scores[index], game.score)
+                self.assertEqual(batch.is_finished[index], game.is_finished)
+
+    def test_irremovable_block(self):
+        batch = BatchGame(np.array([[[1, 2], [2, 1]]], dtype=np.int8))
+        deltas = batch.step(np.array([0]), np.array([0]))
+        self.assertEqual(deltas.tolist(), [0])
+        self.assertTrue(batch.is_finished[0])
+
+    def test_column_compaction(self):
+        batch = BatchGame(np.array([[[1, 2, 2],
+                                     [3, 3, 3],
+                                     [1, 2, 1]]], dtype=np.int8))
+        deltas = batch.step(np.array([1]), np.array([0]))
+        self.assertEqual(deltas.tolist(), [Game.get_points(3)])
+        np.testing.assert_array_equal(batch.boards[0],
+                                      [[1, 2, 2], [1, 2, 1], [0, 0, 0]])
+
+    def test_scores_do_not_overflow(self):
+        batch = BatchGame(np.array([[[1, 1, 1, 2],
+                                     [2, 3, 3, 1],
+                                     [1, 2, 1, 2],
+                                     [2, 1, 2, 1]]], dtype=np.int8))
+        limit = int(np.iinfo(np.int64).max)
+        batch.scores[0] = limit - 1
+        batch.step(np.array([0]), np.array([0]))
+        self.assertEqual(batch.scores[0], limit - 1 + Game.get_points(3))
+
+        batch.step(np.array([1]), np.array([2]))
+        self.assertEqual(batch.scores[0],
+                         limit - 1 + Game.get_points(3) +
+                         Game.get_points(2))
+
+    def test_huge_blocks(self):
+        batch = BatchGame(np.ones((2, 20, 20), dtype=np.int8))
+        deltas = batch.step(np.array([0, 5]), np.array([0, 5]))
+        self.assertEqual(deltas.tolist(), [Game.get_points(400)] * 2)
+        self.assertEqual(batch.scores.tolist(), [Game.get_points(400)] * 2)
+
+    def test_multicolor_cubes_are_rejected(self):
+        game = Game(3, '')
+        game.get(0, 0).colors = ('red', 'green')
+        with self.assertRaises(ValueError):
+            BatchGame.from_games([game])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import numpy as np
+from batch import BatchGame
+from env import CubesEnv, SubprocVectorEnv
+
+
+class CubesEnvTest(unittest.TestCase):
+
+    def test_reset_is_seeded(self):
+        env = CubesEnv(5, 3)
+        first = env.reset(seed=1).copy()
+        np.testing.assert_array_equal(env.reset(seed=1), first)
+
+    def test_observation_is_read_only_view(self):
+        env = CubesEnv(5, 3)
+        observation = env.reset(seed=1)
+        with self.assertRaises(ValueError):
+            observation[0, 0] = 0
+        x_coord, y_coord = np.argwhere(env.legal_moves())[0]
+        env.step(x_coord, y_coord)
+        self.assertIs(env.reset(), observation)
+        np.testing.assert_array_equal(observation, env.game.boards[0])
+
+    def test_step(self):
+        env = CubesEnv(3, 3)
+        env.reset()
+        env.game.boards[0] = [[1, 1, 2], [1, 3, 1], [2, 3, 2]]
+        np.testing.assert_array_equal(env.legal_moves(),
+                                      [[1, 1, 0], [1, 1, 0], [0, 1, 0]])
+
+        observation, reward, done, info = env.step(0, 0)
+        self.assertEqual(reward, 7)
+        self.assertFalse(done)
+        self.assertEqual(info['score'], 7)
+        np.testing.assert_array_equal(observation,
+                                      [[0, 0, 2], [0, 3, 1], [2, 3, 2]])
+
+    def test_illegal_step(self):
+        env = CubesEnv(3, 3)
+        env.reset()
+        env.game.boards[0] = [[1, 2, 1], [2, 1, 2], [1, 2, 1]]
+        _, reward, done, _ = env.step(1, 1)
+        self.assertEqual(reward, 0)
+        self.assertTrue(done)
+
+
+class SubprocVectorEnvTest(unittest.TestCase):
+
+    def test_same_as_batch_game(self):
+        with SubprocVectorEnv(6, 5, 3, workers=2) as env:
+            observations = env.reset(seed=0)
+            self.assertFalse(observations.flags.writeable)
+            game = BatchGame(observations.copy())
+
+            xs = np.array([0, 1, 2, 3, 4, 0])
+            ys = np.array([4, 3, 2, 1, 0, 0])
+            expected = game.step(xs, ys)
+            _, rewards, dones, infos = env.step(xs, ys)
+            np.testing.assert_array_equal(rewards, expected)
+            np.testing.assert_array_equal(dones, game.is_finished)
+            for index in range(env.num_envs):
+                np.testing.assert_array_equal(
+                    infos['final_observation'][index] if dones[index]
+                    else observations[index], game.boards[index])
+            np.testing.assert_array_equal(env.legal_moves(),
+                                          BatchGame(observations.copy())
+                                          .removable())
+
+    def test_seed_does_not_depend_on_workers(self):
+        boards = []
+        for workers in (1, 3):
+            with SubprocVectorEnv(6, 5, 3, workers=workers) as env:
+                boards.append(env.reset(seed=7).copy())
+        np.testing.assert_array_equal(boards[0], boards[1])
+
+    def test_final_observation(self):
+        with SubprocVectorEnv(2, 4, 7, workers=1) as env:
+            env.reset(seed=0)
+            env.boards[0] = [[1, 2, 1, 2], [3, 4, 3, 4],
+                             [1, 2, 1, 2], [5, 6, 7, 7]]
+            observations, rewards, dones, infos = env.step(
+                np.array([3, 0]), np.array([3, 0]))
+            self.assertTrue(dones[0])
+            self.assertEqual(rewards[0], 2)
+            np.testing.assert_array_equal(infos['final_observation'][0],
+                                          [[1, 2, 1, 2], [3, 4, 3, 4],
+                                           [1, 2, 1, 2], [0, 0, 5, 6]])
+            self.assertTrue(observations[0].all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -87,6 +87,43 @@ class GameTest(unittest.TestCase):
     def test_try_loot_points(self):
         self.assertEqual(GAME.get_points(1), 0)
 
+    def test_change_set(self):
+        game = deepcopy(GAME)
+        received = []
+        game.subscribe(received.append)
+
+        self.assertTrue(game.try_delete_block(game.get(1, 1)))
+        changes = received[0]
+        self.assertEqual(sorted(changes.removed), [(1, 1), (2, 1)])
+        self.assertEqual(changes.falls, {1: {0: 1}, 2: {0: 1}})
+        self.assertEqual(changes.removed_columns, [])
+        self.assertEqual(changes.score_delta, 2)
+        self.assertIs(game.last_changes, changes)
+
+    def test_change_set_removed_columns(self):
+        game = Game(3, 3)
+        game.field.create_from_colors(
+            [
+                ['red', 'red', 'red'],
+                ['green', 'green', 'green'],
+                ['blue', 'yellow', 'blue']
+            ])
+        received = []
+        game.subscribe(received.append)
+
+        game.try_delete_block(game.get(1, 0))
+        self.assertEqual(received[0].removed_columns, [1])
+        self.assertEqual(received[0].falls, {})
+
+    def test_irremovable_block_is_not_notified(self):
+        game = deepcopy(GAME)
+        received = []
+        game.subscribe(received.append)
+
+        self.assertFalse(game.try_delete_block(game.get(2, 0)))
+        self.assertEqual(received, [])
+        self.assertFalse(game.last_changes)
+
 
 if __name__ == '__main__':
     unittest.main()
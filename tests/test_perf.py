@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from perf import FrameProfiler, load_script
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FrameProfilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.profiler = FrameProfiler(clock=self.clock)
+
+    def test_nested_measures(self):
+        with self.profiler.event('paint'):
+            with self.profiler.measure('paint'):
+                self.clock.now += 3
+                with self.profiler.measure('game'):
+                    self.clock.now += 2
+        record = self.profiler.records[0]
+        self.assertEqual((record['paint'], record['game']), (3, 2))
+
+    def test_input_latency(self):
+        with self.profiler.event('click'):
+            self.profiler.input()
+            self.clock.now += 1
+            with self.profiler.event('paint'):
+                self.clock.now += 4
+                self.profiler.frame()
+        with self.profiler.event('paint'):
+            self.clock.now += 10
+            self.profiler.frame()
+
+        click, first, second = self.profiler.records
+        self.assertEqual(click['event'], 'click')
+        self.assertEqual(first['input_latency'], 5)
+        self.assertIsNone(first['frame_interval'])
+        self.assertIsNone(second['input_latency'])
+        self.assertEqual(second['frame_interval'], 10)
+
+    def test_disabled(self):
+        profiler = FrameProfiler(enabled=False)
+        with profiler.event('click'):
+            with profiler.measure('game'):
+                profiler.input()
+            profiler.frame()
+        self.assertEqual(profiler.records, [])
+
+    def test_save_csv(self):
+        with self.profiler.event('move'):
+            with self.profiler.measure('game'):
+                self.clock.now += 0.002
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.csv')
+            self.profiler.save_csv(path)
+            with open(path) as file:
+                lines = file.read().split('\n')
+        self.assertEqual(lines[0], ','.join(FrameProfiler.fields))
+        self.assertEqual(lines[1], 'move,0.000,2.000,0.000,,')
+
+    def test_load_script(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'script.txt')
+            with open(path, 'w') as file:
+                file.write('# comment\nmove 1 2\n\nclick 3 4  # go\nrestart\n')
+            self.assertEqual(load_script(path),
+                             [('move', [1, 2]), ('click', [3, 4]),
+                              ('restart', [])])
+
+
+if __name__ == '__main__':
+    unittest.main()
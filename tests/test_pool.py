@@ -0,0 +1,132 @@
+import time
+import unittest
+from game import Game
+from pool import GamePool, has_moves, is_balanced
+
+SETTINGS = {
+    'colors_count': 3,
+    'multiple_colors': 2,
+    'multicube_count': 0
+}
+
+
+class GamePoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = GamePool(capacity=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def wait_until_full(self, queue):
+        deadline = time.time() + 5
+        while not queue.full() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(queue.full())
+
+    def test_get(self):
+        game = self.pool.get(5, 'Nick', SETTINGS)
+        self.assertEqual(game.size, 5)
+        self.assertEqual(game.player, 'Nick')
+        self.assertEqual(game.settings, SETTINGS)
+        self.assertEqual(game.score, 0)
+
+    def test_prepare_fills_queue(self):
+        queue = self.pool.prepare(5, SETTINGS)
+        self.wait_until_full(queue)
+        self.assertIs(self.pool.prepare(5, dict(SETTINGS)), queue)
+
+        ready = queue.queue[0]
+        self.assertIs(self.pool.get(5, 'Nick', SETTINGS), ready)
+
+    def test_capacity_is_bounded_by_cubes(self):
+        pool = GamePool(capacity=3, max_cubes=50)
+        queue = pool.prepare(5, SETTINGS)
+        pool.close()
+        self.assertEqual(queue.maxsize, 2)
+
+    def test_old_profiles_are_dropped(self):
+        pool = GamePool(max_profiles=1)
+        pool.prepare(5, SETTINGS)
+        pool.prepare(6, SETTINGS)
+        profiles = list(pool._profiles)
+        pool.close()
+        self.assertEqual(profiles, [GamePool.get_profile(6, SETTINGS)])
+
+    def test_evicted_worker_stops_between_attempts(self):
+        pool = GamePool(max_profiles=1, accept=lambda game: False,
+                        max_attempts=10 ** 6)
+        self.addCleanup(pool.close)
+        pool.prepare(5, SETTINGS)
+        _, _, worker = pool._profiles[GamePool.get_profile(5, SETTINGS)]
+        pool.prepare(6, SETTINGS)
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+
+    def test_close_without_waiting(self):
+        pool = GamePool(accept=lambda game: False, max_attempts=10 ** 6)
+        pool.prepare(5, SETTINGS)
+        _, _, worker = pool._profiles[GamePool.get_profile(5, SETTINGS)]
+        pool.close(wait=False)
+        self.assertEqual(pool._profiles, {})
+        worker.join(timeout=5)
+        self.assertFalse(worker.is_alive())
+
+    def test_accept(self):
+        generated = []
+
+        def accept(game):
+            generated.append(game)
+            return len(generated) == 3
+
+        pool = GamePool(accept=accept)
+        self.assertIs(pool.generate(4, SETTINGS, pool.rng), generated[2])
+
+    def test_rejected_boards_are_not_returned(self):
+        pool = GamePool(accept=lambda game: False, max_attempts=3,
+                        background=False)
+        self.assertIsNone(pool.generate(4, SETTINGS, pool.rng))
+        self.assertEqual(pool.get(4, 'Nick', SETTINGS).size, 4)
+
+    def test_seeded_boards(self):
+        boards = []
+        for _ in range(2):
+            pool = GamePool(seed=3, background=False)
+            game = pool.get(6, 'Nick', SETTINGS)
+            boards.append([game.get(x_coord, y_coord).colors
+                           for x_coord in range(6) for y_coord in range(6)])
+        self.assertEqual(boards[0], boards[1])
+        self.assertIsNone(pool.prepare(6, SETTINGS))
+
+    def test_worker_streams_are_seeded(self):
+        boards = []
+        for _ in range(2):
+            pool = GamePool(capacity=1, seed=3)
+            queue = pool.prepare(6, SETTINGS)
+            self.wait_until_full(queue)
+            game = queue.get()
+            pool.close()
+            boards.append([game.get(x_coord, y_coord).colors
+                           for x_coord in range(6) for y_coord in range(6)])
+        self.assertEqual(boards[0], boards[1])
+
+    def test_filters(self):
+        game = Game(3, '', SETTINGS)
+        game.field.create_from_colors(
+            [
+                ['red', 'green', 'red'],
+                ['green', 'red', 'green'],
+                ['red', 'green', 'red']
+            ])
+        self.assertFalse(has_moves(game))
+
+        game.field.cubes = {'red': 3, 'green': 3, 'yellow': 3}
+        self.assertTrue(is_balanced(game))
+        game.field.cubes = {'red': 8, 'green': 1}
+        self.assertFalse(is_balanced(game))
+        game.field.cubes = {'red': 5, 'green': 1, 'yellow': 3}
+        self.assertFalse(is_balanced(game))
+
+
+if __name__ == '__main__':
+    unittest.main()
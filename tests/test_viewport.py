@@ -0,0 +1,53 @@
+import unittest
+from viewport import Viewport
+
+
+class ViewportTest(unittest.TestCase):
+
+    def test_fits_whole_board(self):
+        viewport = Viewport(300, 300, 10)
+        self.assertEqual(viewport.cell_size, 30)
+        self.assertEqual(viewport.to_cell(0, 0), (0, 0))
+        self.assertEqual(viewport.to_cell(299, 299), (9, 9))
+
+    def test_outside_of_viewport(self):
+        viewport = Viewport(300, 300, 10)
+        self.assertIsNone(viewport.to_cell(-1, 0))
+        self.assertIsNone(viewport.to_cell(0, 300))
+
+    def test_zoom_keeps_anchor(self):
+        viewport = Viewport(300, 300, 10)
+        cell = viewport.to_cell(150, 150)
+        viewport.zoom(2, 150, 150)
+        self.assertEqual(viewport.cell_size, 60)
+        self.assertEqual(viewport.to_cell(150, 150), cell)
+
+    def test_zoom_out_is_limited(self):
+        viewport = Viewport(300, 300, 10)
+        viewport.zoom(0.5)
+        self.assertEqual(viewport.cell_size, 30)
+
+    def test_scroll_is_clamped(self):
+        viewport = Viewport(300, 300, 10)
+        viewport.zoom(2)
+        viewport.scroll(1000, -1000)
+        self.assertEqual((viewport.offset_x, viewport.offset_y), (300, 0))
+        self.assertEqual(viewport.to_cell(0, 0), (5, 0))
+
+    def test_visible_cells(self):
+        viewport = Viewport(300, 300, 100)
+        viewport.zoom(10)
+        viewport.scroll(45, 0)
+        columns, rows = viewport.visible_cells()
+        self.assertEqual(columns, range(1, 12))
+        self.assertEqual(rows, range(0, 11))
+
+    def test_image_mode(self):
+        viewport = Viewport(300, 300, 500)
+        self.assertTrue(viewport.is_image_mode)
+        viewport.zoom(50)
+        self.assertFalse(viewport.is_image_mode)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+class Viewport:
+    max_cell_size = 60
+    image_threshold = 8
+
+    def __init__(self, width, height, board_size):
+        self.width = width
+        self.height = height
+        self.board_size = board_size
+        self.min_cell_size = min(width, height) / board_size
+        self.cell_size = self.min_cell_size
+        self.offset_x = 0
+        self.offset_y = 0
+
+    @property
+    def board_extent(self):
+        return self.board_size * self.cell_size
+
+    @property
+    def is_image_mode(self):
+        return self.cell_size < self.image_threshold
+
+    def contains(self, x_coord, y_coord):
+        return 0 <= x_coord < self.width and 0 <= y_coord < self.height
+
+    def to_cell(self, x_coord, y_coord):
+        if not self.contains(x_coord, y_coord):
+            return None
+        cell_x = int((x_coord + self.offset_x) // self.cell_size)
+        cell_y = int((y_coord + self.offset_y) // self.cell_size)
+        if cell_x >= self.board_size or cell_y >= self.board_size:
+            return None
+        return cell_x, cell_y
+
+    def to_screen(self, cell_x, cell_y):
+        return (cell_x * self.cell_size - self.offset_x,
+                cell_y * self.cell_size - self.offset_y)
+
+    def visible_cells(self):
+        first_x = int(self.offset_x // self.cell_size)
+        first_y = int(self.offset_y // self.cell_size)
+        last_x = int((self.offset_x + self.width) // self.cell_size) + 1
+        last_y = int((self.offset_y + self.height) // self.cell_size) + 1
+        return (range(first_x, min(last_x, self.board_size)),
+                range(first_y, min(last_y, self.board_size)))
+
+    def scroll(self, delta_x, delta_y):
+        self.offset_x += delta_x
+        self.offset_y += delta_y
+        self.clamp()
+
+    def zoom(self, factor, x_coord=0, y_coord=0):
+        cell_size = min(max(self.cell_size * factor, self.min_cell_size),
+                        self.max_cell_size)
+        anchor_x = (x_coord + self.offset_x) / self.cell_size
+        anchor_y = (y_coord + self.offset_y) / self.cell_size
+        self.cell_size = cell_size
+        self.offset_x = anchor_x * cell_size - x_coord
+        self.offset_y = anchor_y * cell_size - y_coord
+        self.clamp()
+
+    def clamp(self):
+        self.offset_x = min(max(self.offset_x, 0),
+                            max(self.board_extent - self.width, 0))
+        self.offset_y = min(max(self.offset_y, 0),
+                            max(self.board_extent - self.height, 0))